@@ -1,11 +1,11 @@
-from threading import Thread
+from threading import Event, Thread
 
 import numpy as np
 from flask import Flask, render_template_string, request, send_from_directory
 from jinja2 import BaseLoader
 
 from openrecall.config import appdata_folder, screenshots_path
-from openrecall.database import create_db, get_all_entries, get_timestamps
+from openrecall.database import create_db, fetch_state, get_all_entries
 from openrecall.nlp import cosine_similarity, get_embedding
 from openrecall.screenshot import record_screenshots_thread
 from openrecall.utils import human_readable_time, timestamp_to_human_readable
@@ -87,8 +87,7 @@ app.jinja_env.loader = StringLoader()
 @app.route("/")
 def timeline():
     # connect to db
-    entries = get_all_entries()
-    timestamps = [entry.timestamp for entry in entries]
+    entries, timestamps = fetch_state()
     timestamp_map = {entry.timestamp: entry.filename for entry in entries}
     
     return render_template_string(
@@ -191,7 +190,13 @@ if __name__ == "__main__":
     print(f"Appdata folder: {appdata_folder}")
 
     # Start the thread to record screenshots
-    t = Thread(target=record_screenshots_thread)
+    stop_event = Event()
+    t = Thread(target=record_screenshots_thread, args=(stop_event,))
     t.start()
 
-    app.run(port=8082)
+    try:
+        app.run(port=8082)
+    finally:
+        # Let the recorder finish its iteration and flush buffered entries
+        stop_event.set()
+        t.join()
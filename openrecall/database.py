@@ -1,7 +1,11 @@
 import sqlite3
+import threading
+import weakref
 from collections import namedtuple
+from contextlib import contextmanager
+from itertools import chain
 import numpy as np
-from typing import Any, List, Optional, Tuple
+from typing import Any, Iterator, List, Optional, Tuple
 
 from openrecall.config import db_path
 
@@ -9,131 +13,586 @@ from openrecall.config import db_path
 # Define the structure of a database entry using namedtuple
 Entry = namedtuple("Entry", ["id", "app", "title", "text", "timestamp", "embedding", "filename"])
 
+# Connection-level tuning applied to every new connection. journal_mode=WAL is
+# persisted in the database file; the others only last for the connection.
+# WAL lets readers proceed alongside the screenshot writer, and synchronous=NORMAL
+# is durable in WAL mode while avoiding an fsync on every commit.
+_PRAGMAS: Tuple[str, ...] = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-64000",  # 64 MB (negative values are in KiB)
+    "PRAGMA busy_timeout=5000",  # milliseconds
+    "PRAGMA mmap_size=268435456",  # 256 MB
+)
+
+# Stored in PRAGMA user_version once create_db has brought the schema up to date.
+# Unversioned (0) databases may still carry the legacy UNIQUE timestamp or lack
+# the filename column; version 2 still stores embeddings inside 'entries',
+# version 3 indexes timestamps without the id tie-breaker, version 4 still
+# declares the id AUTOINCREMENT and version 5 stores float32 embeddings.
+_SCHEMA_VERSION: int = 6
+
+# Embeddings live in their own table, keyed by entry id, so scans over entry
+# metadata don't drag the much larger embedding BLOBs through the page cache.
+# The id is a plain rowid alias: AUTOINCREMENT would cost an extra
+# sqlite_sequence update per insert only to stop ids of deleted rows being reused.
+_CREATE_ENTRIES_SQL: str = """CREATE TABLE IF NOT EXISTS entries (
+                                  id INTEGER PRIMARY KEY,
+                                  app TEXT,
+                                  title TEXT,
+                                  text TEXT,
+                                  timestamp INTEGER,
+                                  filename TEXT
+                              )"""
+# Index timestamps newest-first to match every ORDER BY timestamp DESC query
+_CREATE_TS_INDEX_SQL: str = (
+    "CREATE INDEX IF NOT EXISTS idx_ts_desc ON entries (timestamp DESC, id DESC)"
+)
+_CREATE_EMBEDDINGS_SQL: str = """CREATE TABLE IF NOT EXISTS embeddings (
+                                     id INTEGER PRIMARY KEY,
+                                     embedding BLOB
+                                 )"""
+
+# Size of the float32 scale stored after each quantized embedding
+_SCALE_SIZE: int = np.dtype(np.float32).itemsize
+
+_FETCH_CHUNK_SIZE: int = 4096
+
+# sqlite3 keeps prepared statements in a per-connection LRU keyed by the SQL
+# text (128 statements by default), so hot queries are kept as constants to
+# always hit the same entry.
+#
+# Entries are ordered newest first, with the id breaking ties between screenshots
+# of different monitors taken at the same timestamp; idx_ts_desc matches this
+# order exactly so no sort step is needed.
+_SELECT_ENTRIES_SQL: str = (
+    "SELECT e.id, e.app, e.title, e.text, e.timestamp, m.embedding, e.filename "
+    "FROM entries AS e JOIN embeddings AS m ON m.id = e.id"
+)
+_ORDER_ENTRIES_SQL: str = " ORDER BY e.timestamp DESC, e.id DESC"
+_INSERT_SQL: str = (
+    "INSERT INTO entries (id, text, timestamp, app, title, filename) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERT_EMBEDDING_SQL: str = "INSERT INTO embeddings (id, embedding) VALUES (?, ?)"
+
+
+def _quantize_embedding(embedding: np.ndarray) -> bytes:
+    """
+    Encodes an embedding as a quantized BLOB.
+
+    Values are quantized symmetrically to int8 with one float32 scale per
+    embedding, stored after the values. This takes a quarter of the float32 size
+    with negligible effect on cosine similarity. NaN and infinite components
+    are stored as zero, since they would otherwise corrupt the scale.
+
+    Args:
+        embedding: The embedding vector.
+
+    Returns:
+        bytes: The int8 values followed by the float32 scale.
+    """
+    values = np.asarray(embedding, dtype=np.float32)
+    if not np.isfinite(values).all():
+        values = np.nan_to_num(values, nan=0.0, posinf=0.0, neginf=0.0)
+    scale = np.float32(np.abs(values).max() / 127 if values.size else 0)
+    if scale == 0:
+        quantized = np.zeros(values.shape, dtype=np.int8)
+    else:
+        quantized = np.rint(values / scale).clip(-127, 127).astype(np.int8)
+    return quantized.tobytes() + scale.tobytes()
+
+
+def _decode_embeddings(data: bytes, count: int) -> np.ndarray:
+    """
+    Decodes `count` equally sized quantized embeddings stored back to back.
+
+    Args:
+        data: The concatenated BLOBs written by `_quantize_embedding`.
+        count: The number of embeddings in `data`.
+
+    Returns:
+        np.ndarray: A float32 matrix of shape (count, D).
+    """
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(count, -1)
+    quantized = raw[:, :-_SCALE_SIZE].view(np.int8)
+    scales = raw[:, -_SCALE_SIZE:].copy().view(np.float32)
+    return quantized.astype(np.float32) * scales
+
+
+class _Embedding:
+    """
+    Marks an embedding query parameter for quantized storage.
+
+    The sqlite3 adapter is registered for this wrapper rather than for
+    `np.ndarray`, so only parameters wrapped on purpose are quantized; ndarrays
+    bound anywhere else in the process keep sqlite3's default handling.
+    """
+
+    __slots__ = ("values",)
+
+    def __init__(self, values: np.ndarray) -> None:
+        self.values = values
+
+
+sqlite3.register_adapter(_Embedding, lambda embedding: _quantize_embedding(embedding.values))
+
+
+def _connect() -> sqlite3.Connection:
+    """
+    Opens a connection to the database and applies the tuning PRAGMAs.
+
+    Returns:
+        sqlite3.Connection: A configured connection to `db_path`.
+    """
+    conn = sqlite3.connect(db_path, check_same_thread=False)
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+# Connections are opened lazily and reused across calls instead of reconnecting
+# for every query. SQLite allows a single writer, so one shared write connection
+# is serialized by `_write_lock`; each thread gets its own read connection.
+_write_conn: Optional[sqlite3.Connection] = None
+# Reentrant so bulk_ingest() can hold it across the inserts it wraps.
+# It serializes threads in this process; BEGIN IMMEDIATE and busy_timeout
+# handle any other process writing to the same database.
+_write_lock = threading.RLock()
+_read_local = threading.local()
+# Weak, so a read connection lives only as long as its thread's locals
+_read_holders: "weakref.WeakSet[_ReadConnection]" = weakref.WeakSet()
+_read_holders_lock = threading.Lock()
+# Bumped by close_connections() so threads drop their stale read connection.
+_read_generation = 0
+
+
+class _ReadConnection:
+    """
+    Holds one thread's read connection in `_read_local`.
+
+    The connection is closed when the holder is garbage collected, which happens
+    when its thread exits (e.g. a per-request server thread), or earlier through
+    `close_connections()`.
+    """
+
+    __slots__ = ("conn", "generation", "close", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection, generation: int) -> None:
+        self.conn = conn
+        self.generation = generation
+        self.close = weakref.finalize(self, conn.close)
+
+
+def _get_write_conn() -> sqlite3.Connection:
+    """
+    Returns the shared write connection, opening it on first use.
+
+    The caller must hold `_write_lock` for as long as it uses the connection.
+
+    Returns:
+        sqlite3.Connection: The shared write connection.
+    """
+    global _write_conn
+    if _write_conn is None:
+        _write_conn = _connect()
+        # Transactions are opened explicitly by _write_transaction()
+        _write_conn.isolation_level = None
+    return _write_conn
+
+
+@contextmanager
+def _write_transaction() -> Iterator[sqlite3.Cursor]:
+    """
+    Runs a write transaction on the shared write connection.
+
+    BEGIN IMMEDIATE takes SQLite's write lock up front, waiting up to
+    busy_timeout for other writers, so the transaction can't fail with
+    SQLITE_BUSY halfway through. The transaction is committed when the block
+    exits normally and rolled back if it raises.
+
+    Yields:
+        sqlite3.Cursor: A cursor on the write connection.
+    """
+    with _write_lock:
+        conn = _get_write_conn()
+        cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield cursor
+            # Inside the try: a failed COMMIT must still roll back, or the shared
+            # connection would be left inside the transaction.
+            cursor.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                cursor.execute("ROLLBACK")
+            raise
+
+
+def _get_read_conn() -> sqlite3.Connection:
+    """
+    Returns the calling thread's read connection, opening it on first use.
+
+    Returns:
+        sqlite3.Connection: A read connection owned by the current thread.
+    """
+    holder = getattr(_read_local, "holder", None)
+    if holder is None or holder.generation != _read_generation:
+        conn = _connect()
+        # Reads never need an explicit transaction: each statement runs in
+        # autocommit mode against its own WAL snapshot.
+        conn.isolation_level = None
+        holder = _ReadConnection(conn, _read_generation)
+        with _read_holders_lock:
+            _read_holders.add(holder)
+        _read_local.holder = holder
+    return holder.conn
+
+
+def close_connections() -> None:
+    """
+    Closes the shared write connection and every live thread's read connection.
+
+    Connections are reopened lazily on the next database call.
+    """
+    global _write_conn, _read_generation
+    with _write_lock:
+        if _write_conn is not None:
+            _write_conn.close()
+            _write_conn = None
+    with _read_holders_lock:
+        # Holders of finished threads are already gone from the WeakSet
+        for holder in list(_read_holders):
+            holder.close()
+        _read_holders.clear()
+        _read_generation += 1
+
+
+def _rebuild_entries_table(cursor: sqlite3.Cursor, create_sql: str) -> None:
+    """
+    Recreates the 'entries' table from `create_sql`, keeping its rows.
+
+    SQLite cannot alter constraints in place, so the table is renamed, recreated
+    and the columns shared by both versions are copied across.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+        create_sql: The CREATE TABLE statement for the new 'entries' table.
+    """
+    cursor.execute("ALTER TABLE entries RENAME TO entries_old")
+    cursor.execute(create_sql)
+
+    # List columns explicitly: older tables may lack some (e.g. filename) or
+    # carry ones the new schema dropped (e.g. embedding).
+    cursor.execute("PRAGMA table_info(entries_old)")
+    columns_old = [row[1] for row in cursor.fetchall()]
+    cursor.execute("PRAGMA table_info(entries)")
+    common_columns = [row[1] for row in cursor.fetchall() if row[1] in columns_old]
+    cols_str = ", ".join(common_columns)
+    cursor.execute(f"INSERT INTO entries ({cols_str}) SELECT {cols_str} FROM entries_old")
+
+    # Indexes and triggers are dropped along with the old table
+    cursor.execute("DROP TABLE entries_old")
+
+
+def _has_unique_timestamp(cursor: sqlite3.Cursor) -> bool:
+    """
+    Checks whether the 'entries' table has a UNIQUE index on timestamp alone.
+
+    Args:
+        cursor: A cursor on the write connection.
+
+    Returns:
+        bool: True if a unique index covers exactly the timestamp column.
+    """
+    cursor.execute("PRAGMA index_list(entries)")
+    # Rows are (seq, name, unique, origin, partial)
+    unique_indexes = [row[1] for row in cursor.fetchall() if row[2]]
+    for index_name in unique_indexes:
+        cursor.execute(f"PRAGMA index_info('{index_name}')")
+        # Rows are (seqno, cid, name)
+        if [row[2] for row in cursor.fetchall()] == ["timestamp"]:
+            return True
+    return False
+
+
+def _migrate_to_v2(cursor: sqlite3.Cursor) -> None:
+    """
+    Upgrades an unversioned database: removes the UNIQUE constraint on timestamp
+    and makes sure the filename column exists.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+    """
+    if _has_unique_timestamp(cursor):
+        print("Detected legacy UNIQUE constraint on timestamp. Migrating database...")
+        _rebuild_entries_table(
+            cursor,
+            """CREATE TABLE entries (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   app TEXT,
+                   title TEXT,
+                   text TEXT,
+                   timestamp INTEGER,
+                   embedding BLOB,
+                   filename TEXT
+               )""",
+        )
+        print("Migration complete.")
+
+    # Ensure filename column exists (for databases created before it was added)
+    cursor.execute("PRAGMA table_info(entries)")
+    if "filename" not in [row[1] for row in cursor.fetchall()]:
+        cursor.execute("ALTER TABLE entries ADD COLUMN filename TEXT")
+
+
+def _migrate_to_v3(cursor: sqlite3.Cursor) -> None:
+    """
+    Moves embeddings from the 'entries' table into the 'embeddings' table.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+    """
+    cursor.execute(_CREATE_EMBEDDINGS_SQL)
+    cursor.execute("INSERT INTO embeddings (id, embedding) SELECT id, embedding FROM entries")
+    _rebuild_entries_table(cursor, _CREATE_ENTRIES_SQL)
+
+
+def _migrate_to_v4(cursor: sqlite3.Cursor) -> None:
+    """
+    Drops the timestamp-only idx_ts_desc so create_db recreates it with the id
+    tie-breaker.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+    """
+    cursor.execute("DROP INDEX IF EXISTS idx_ts_desc")
+
+
+def _migrate_to_v5(cursor: sqlite3.Cursor) -> None:
+    """
+    Rebuilds the 'entries' table without AUTOINCREMENT on its id.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+    """
+    _rebuild_entries_table(cursor, _CREATE_ENTRIES_SQL)
+
+
+def _migrate_to_v6(cursor: sqlite3.Cursor) -> None:
+    """
+    Re-encodes stored float32 embeddings as quantized int8.
+
+    Args:
+        cursor: A cursor on the write connection, inside the migration transaction.
+    """
+    last_id = 0
+    while True:
+        cursor.execute(
+            "SELECT id, embedding FROM embeddings WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, _FETCH_CHUNK_SIZE),
+        )
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        cursor.executemany(
+            "UPDATE embeddings SET embedding = ? WHERE id = ?",
+            [
+                (_Embedding(np.frombuffer(blob, dtype=np.float32)), id_)
+                for id_, blob in rows
+            ],
+        )
+        last_id = rows[-1][0]
+
 
 def create_db() -> None:
     """
-    Creates the SQLite database and the 'entries' table if they don't exist.
-    Also handles migration to remove UNIQUE constraint on timestamp if present.
+    Creates the SQLite database and its tables if they don't exist, migrating
+    databases created by older versions to the current schema.
+
+    The schema version is recorded in `PRAGMA user_version`, so databases that
+    are already up to date skip the migration checks on startup.
     """
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            
-            # Check if migration is needed (if timestamp is UNIQUE)
-            cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name='entries'")
-            result = cursor.fetchone()
-            
-            migration_needed = False
-            if result:
-                create_sql = result[0]
-                if "timestamp INTEGER UNIQUE" in create_sql:
-                    migration_needed = True
-                    print("Detected legacy UNIQUE constraint on timestamp. Migrating database...")
-
-            if migration_needed:
-                # 1. Rename existing table
-                cursor.execute("ALTER TABLE entries RENAME TO entries_old")
-                
-                # 2. Create new table without UNIQUE constraint
-                cursor.execute(
-                    """CREATE TABLE entries (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           app TEXT,
-                           title TEXT,
-                           text TEXT,
-                           timestamp INTEGER,
-                           embedding BLOB,
-                           filename TEXT
-                       )"""
-                )
-                
-                # 3. Copy data
-                # Handle case where filename might strictly not exist in entries_old (though we fixed that previously)
-                # But best to be explicit about columns to match schemas or use common columns.
-                # Since we know we just have a subset of columns potentially...
-                # Actually, simple INSERT INTO ... SELECT * works if columns align, but they might not if we added filename later.
-                # Safe approach: List columns.
-                
-                cursor.execute("PRAGMA table_info(entries_old)")
-                columns_old = [row[1] for row in cursor.fetchall()]
-                common_columns = [
-                    col for col in ["id", "app", "title", "text", "timestamp", "embedding", "filename"]
-                    if col in columns_old
-                ]
-                cols_str = ", ".join(common_columns)
-                
-                cursor.execute(f"INSERT INTO entries ({cols_str}) SELECT {cols_str} FROM entries_old")
-                
-                # 4. Drop old table
-                cursor.execute("DROP TABLE entries_old")
-                print("Migration complete.")
-                
-            else:
-                # Normal creation if not exists
-                cursor.execute(
-                    """CREATE TABLE IF NOT EXISTS entries (
-                           id INTEGER PRIMARY KEY AUTOINCREMENT,
-                           app TEXT,
-                           title TEXT,
-                           text TEXT,
-                           timestamp INTEGER,
-                           embedding BLOB,
-                           filename TEXT
-                       )"""
-                )
-
-            # Add index on timestamp for faster lookups (non-unique)
+        with _write_transaction() as cursor:
+            cursor.execute("PRAGMA user_version")
+            version = cursor.fetchone()[0]
+            if version >= _SCHEMA_VERSION:
+                # bulk_ingest() drops this index; restore it if a bulk import
+                # was interrupted before it could rebuild it.
+                cursor.execute(_CREATE_TS_INDEX_SQL)
+                return
+
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='entries'")
+            if cursor.fetchone() is not None:
+                if version < 2:
+                    _migrate_to_v2(cursor)
+                if version < 3:
+                    _migrate_to_v3(cursor)
+                if version < 4:
+                    _migrate_to_v4(cursor)
+                # _migrate_to_v3 already rebuilt older tables without AUTOINCREMENT
+                if 3 <= version < 5:
+                    _migrate_to_v5(cursor)
+                if version < 6:
+                    _migrate_to_v6(cursor)
+
+            cursor.execute(_CREATE_ENTRIES_SQL)
+            cursor.execute(_CREATE_EMBEDDINGS_SQL)
+            # idx_ts_desc replaces the older ascending idx_timestamp
+            cursor.execute("DROP INDEX IF EXISTS idx_timestamp")
+            cursor.execute(_CREATE_TS_INDEX_SQL)
+            # Keep embeddings in step with entries however rows are deleted
             cursor.execute(
-                "CREATE INDEX IF NOT EXISTS idx_timestamp ON entries (timestamp)"
+                """CREATE TRIGGER IF NOT EXISTS entries_delete_embedding
+                   AFTER DELETE ON entries
+                   BEGIN
+                       DELETE FROM embeddings WHERE id = OLD.id;
+                   END"""
             )
-            
-            # Ensure filename column exists (for backward compatibility if not migrating but older schema)
-            # This is partly redundant if migration ran, but good for safety if table existed without UNIQUE but without filename (unlikely given flow)
-            try:
-                cursor.execute("SELECT filename FROM entries LIMIT 1")
-            except sqlite3.OperationalError:
-                try:
-                    cursor.execute("ALTER TABLE entries ADD COLUMN filename TEXT")
-                except sqlite3.OperationalError: 
-                    pass # Ignore if it somehow exists now
-
-            conn.commit()
+
+            cursor.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
     except sqlite3.Error as e:
         print(f"Database error during table creation/migration: {e}")
 
 
+def _embeddings_from_blobs(blobs: List[bytes]) -> List[np.ndarray]:
+    """
+    Deserializes embedding BLOBs into float32 arrays.
+
+    When all embeddings have the same size, the BLOBs are joined and decoded in
+    one pass, so every returned array is a row view into one contiguous (N, D)
+    matrix instead of a separate allocation.
+
+    Args:
+        blobs: The raw embedding BLOBs.
+
+    Returns:
+        List[np.ndarray]: One float32 array per BLOB, in the same order.
+    """
+    if len(set(map(len, blobs))) > 1:
+        return [_decode_embeddings(blob, 1)[0] for blob in blobs]
+    return list(_decode_embeddings(b"".join(blobs), len(blobs)))
+
+
+def _entries_from_rows(rows: List[Tuple[Any, ...]]) -> List[Entry]:
+    """
+    Converts rows selected with `_SELECT_ENTRIES_SQL` into Entry namedtuples.
+
+    Args:
+        rows: Rows whose columns are in Entry field order.
+
+    Returns:
+        List[Entry]: The corresponding entries.
+    """
+    if not rows:
+        return []
+    embeddings = _embeddings_from_blobs([row[5] for row in rows])
+    # Columns arrive in Entry field order (create_db guarantees filename
+    # exists), so unpack positionally instead of slicing each row.
+    return [
+        Entry(id_, app, title, text, timestamp, embedding, filename)
+        for (id_, app, title, text, timestamp, _, filename), embedding in zip(rows, embeddings)
+    ]
+
+
+def iter_entries() -> Iterator[Entry]:
+    """
+    Lazily yields all entries from the database, newest first.
+
+    Rows are fetched in chunks of `_FETCH_CHUNK_SIZE` so memory use stays bounded
+    no matter how many entries are stored.
+
+    Yields:
+        Entry: Each entry as an Entry namedtuple. Stops early if an error occurs.
+    """
+    try:
+        cursor = _get_read_conn().execute(_SELECT_ENTRIES_SQL + _ORDER_ENTRIES_SQL)
+        while True:
+            rows = cursor.fetchmany(_FETCH_CHUNK_SIZE)
+            if not rows:
+                break
+            yield from _entries_from_rows(rows)
+    except sqlite3.Error as e:
+        print(f"Database error while fetching all entries: {e}")
+
+
 def get_all_entries() -> List[Entry]:
     """
     Retrieves all entries from the database.
 
+    Prefer `get_entries` when only the most recent entries are needed; this
+    loads every row into memory. The embeddings of the returned entries are row
+    views into one contiguous matrix.
+
     Returns:
         List[Entry]: A list of all entries as Entry namedtuples.
                      Returns an empty list if the table is empty or an error occurs.
     """
-    entries: List[Entry] = []
     try:
-        with sqlite3.connect(db_path) as conn:
-            conn.row_factory = sqlite3.Row  # Return rows as dictionary-like objects
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, app, title, text, timestamp, embedding, filename FROM entries ORDER BY timestamp DESC")
-            results = cursor.fetchall()
-            for row in results:
-                # Deserialize the embedding blob back into a NumPy array
-                embedding = np.frombuffer(row["embedding"], dtype=np.float32) # Assuming float32, adjust if needed
-                entries.append(
-                    Entry(
-                        id=row["id"],
-                        app=row["app"],
-                        title=row["title"],
-                        text=row["text"],
-                        timestamp=row["timestamp"],
-                        embedding=embedding,
-                        filename=row["filename"] if "filename" in row.keys() else None,
-                    )
-                )
+        rows = _get_read_conn().execute(_SELECT_ENTRIES_SQL + _ORDER_ENTRIES_SQL).fetchall()
     except sqlite3.Error as e:
         print(f"Database error while fetching all entries: {e}")
-    return entries
+        return []
+    return _entries_from_rows(rows)
+
+
+def get_entries(
+    limit: int, before_timestamp: Optional[int] = None, before_id: Optional[int] = None
+) -> List[Entry]:
+    """
+    Retrieves one page of entries, newest first, using keyset pagination.
+
+    Pass the timestamp and id of the last entry of the previous page to get the
+    next one. Each page is an index range search, so its cost does not grow with
+    the number of stored entries.
+
+    Args:
+        limit (int): The maximum number of entries to return.
+        before_timestamp (Optional[int]): Only return entries older than this
+            timestamp (or, with `before_id`, ordered after that entry).
+        before_id (Optional[int]): The id of the last entry of the previous page,
+            used to page through entries sharing `before_timestamp`.
+
+    Returns:
+        List[Entry]: Up to `limit` entries as Entry namedtuples.
+                     Returns an empty list if there are none or an error occurs.
+    """
+    if before_timestamp is None:
+        where, params = "", (limit,)
+    elif before_id is None:
+        where, params = " WHERE e.timestamp < ?", (before_timestamp, limit)
+    else:
+        where, params = " WHERE (e.timestamp, e.id) < (?, ?)", (before_timestamp, before_id, limit)
+    try:
+        rows = _get_read_conn().execute(
+            _SELECT_ENTRIES_SQL + where + _ORDER_ENTRIES_SQL + " LIMIT ?", params
+        ).fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error while fetching entries: {e}")
+        return []
+    return _entries_from_rows(rows)
+
+
+def fetch_state(limit: Optional[int] = None) -> Tuple[List[Entry], List[int]]:
+    """
+    Retrieves the most recent entries and their timestamps with a single query.
+
+    The timestamps are taken from the fetched rows rather than queried
+    separately. Pass `limit` to read only the newest page through
+    `get_entries` instead of loading the whole table.
+
+    Args:
+        limit (Optional[int]): The maximum number of most recent entries to
+            return, or None for all of them.
+
+    Returns:
+        Tuple[List[Entry], List[int]]: The entries, newest first, and their
+            timestamps in the same order. Both are empty if an error occurs.
+    """
+    entries = get_all_entries() if limit is None else get_entries(limit)
+    return entries, [entry.timestamp for entry in entries]
 
 
 def get_timestamps() -> List[int]:
@@ -146,17 +605,53 @@ def get_timestamps() -> List[int]:
     """
     timestamps: List[int] = []
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            # Use the index for potentially faster retrieval
-            cursor.execute("SELECT timestamp FROM entries ORDER BY timestamp DESC")
-            results = cursor.fetchall()
-            timestamps = [result[0] for result in results]
+        # Use the index for potentially faster retrieval
+        cursor = _get_read_conn().execute("SELECT timestamp FROM entries ORDER BY timestamp DESC")
+        # Flatten the 1-tuples in C rather than with a Python-level loop
+        timestamps = list(chain.from_iterable(cursor))
     except sqlite3.Error as e:
         print(f"Database error while fetching timestamps: {e}")
     return timestamps
 
 
+def get_embeddings_matrix() -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Loads every embedding into a single contiguous matrix.
+
+    Decoding all BLOBs at once avoids creating a separate NumPy array per entry
+    and lets similarity search run as a single matrix product.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The entry ids (int64, ordered by id) and
+            a float32 matrix of shape (N, D) whose rows match those ids.
+            Embeddings whose size differs from the newest one (e.g. from an
+            earlier embedding model) are skipped with a warning.
+            Both arrays are empty if the table is empty or an error occurs.
+    """
+    ids = np.empty(0, dtype=np.int64)
+    matrix = np.empty((0, 0), dtype=np.float32)
+    try:
+        rows = _get_read_conn().execute("SELECT id, embedding FROM embeddings ORDER BY id").fetchall()
+    except sqlite3.Error as e:
+        print(f"Database error while fetching embeddings: {e}")
+        return ids, matrix
+    if not rows:
+        return ids, matrix
+
+    # The newest embedding reflects the current model, so it sets the dimension
+    blob_size = len(rows[-1][1])
+    matching_rows = [row for row in rows if len(row[1]) == blob_size]
+    if len(matching_rows) != len(rows):
+        print(
+            f"Skipping {len(rows) - len(matching_rows)} embeddings whose size differs "
+            f"from the newest embedding ({blob_size} bytes)."
+        )
+        rows = matching_rows
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    # One join and one decode instead of a frombuffer per row
+    return ids, _decode_embeddings(b"".join([row[1] for row in rows]), len(rows))
+
+
 def insert_entry(
     text: str, timestamp: int, embedding: np.ndarray, app: str, title: str, filename: str = None
 ) -> Optional[int]:
@@ -166,7 +661,9 @@ def insert_entry(
     Args:
         text (str): The extracted text content.
         timestamp (int): The Unix timestamp of the screenshot.
-        embedding (np.ndarray): The embedding vector for the text.
+        embedding (np.ndarray): The embedding vector for the text. It is stored
+            quantized to int8, so it reads back with a small rounding error.
+            NaN or infinite components are stored as zero.
         app (str): The name of the active application.
         title (str): The title of the active window.
         filename (str): The filename of the screenshot.
@@ -175,19 +672,13 @@ def insert_entry(
         Optional[int]: The ID of the newly inserted row, or None if insertion fails.
                        Prints an error message to stderr on failure.
     """
-    embedding_bytes: bytes = embedding.astype(np.float32).tobytes() # Ensure consistent dtype
     last_row_id: Optional[int] = None
     try:
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                """INSERT INTO entries (text, timestamp, embedding, app, title, filename)
-                   VALUES (?, ?, ?, ?, ?, ?)""",
-                (text, timestamp, embedding_bytes, app, title, filename),
-            )
-            conn.commit()
+        with _write_transaction() as cursor:
+            cursor.execute(_INSERT_SQL, (None, text, timestamp, app, title, filename))
             if cursor.rowcount > 0: # Check if insert actually happened
                 last_row_id = cursor.lastrowid
+                cursor.execute(_INSERT_EMBEDDING_SQL, (last_row_id, _Embedding(embedding)))
             # else:
                 # Optionally log that a duplicate timestamp was encountered
                 # print(f"Skipped inserting entry with duplicate timestamp: {timestamp}")
@@ -196,3 +687,73 @@ def insert_entry(
         # More specific error handling can be added (e.g., IntegrityError for UNIQUE constraint)
         print(f"Database error during insertion: {e}")
     return last_row_id
+
+
+def insert_entries(
+    entries: List[Tuple[str, int, np.ndarray, str, str, Optional[str]]]
+) -> int:
+    """
+    Inserts several entries in a single transaction.
+
+    Committing once for the whole batch avoids a WAL flush per row, which makes
+    this the preferred path for bulk imports and buffered captures.
+
+    Args:
+        entries: Tuples of (text, timestamp, embedding, app, title, filename),
+                 in the same order as the arguments of `insert_entry`.
+
+    Returns:
+        int: The number of rows inserted, or 0 if the batch fails.
+             Prints an error message on failure; no rows are kept in that case.
+    """
+    if not entries:
+        return 0
+    try:
+        with _write_transaction() as cursor:
+            # executemany() doesn't report per-row ids, so assign them up front;
+            # holding the write lock makes MAX(id) + 1 safe.
+            cursor.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM entries")
+            first_id = cursor.fetchone()[0]
+            ids = range(first_id, first_id + len(entries))
+            cursor.executemany(
+                _INSERT_SQL,
+                [
+                    (id_, text, timestamp, app, title, filename)
+                    for id_, (text, timestamp, _, app, title, filename) in zip(ids, entries)
+                ],
+            )
+            cursor.executemany(
+                _INSERT_EMBEDDING_SQL, zip(ids, (_Embedding(entry[2]) for entry in entries))
+            )
+        return len(entries)
+    except sqlite3.Error as e:
+        print(f"Database error during batch insertion: {e}")
+        return 0
+
+
+@contextmanager
+def bulk_ingest() -> Iterator[None]:
+    """
+    Drops the timestamp index for the duration of a large import.
+
+    Building the index once at the end is cheaper than updating it for every
+    inserted row. Writes from other threads wait until the block exits, and reads
+    fall back to full scans in the meantime, so use this only for imports.
+
+    Example:
+        with bulk_ingest():
+            insert_entries(rows)
+    """
+    with _write_lock:
+        conn = _get_write_conn()
+        try:
+            conn.execute("DROP INDEX IF EXISTS idx_ts_desc")
+        except sqlite3.Error as e:
+            print(f"Database error while dropping index for bulk ingest: {e}")
+        try:
+            yield
+        finally:
+            try:
+                conn.execute(_CREATE_TS_INDEX_SQL)
+            except sqlite3.Error as e:
+                print(f"Database error while rebuilding index after bulk ingest: {e}")
@@ -1,13 +1,14 @@
 import os
+import threading
 import time
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 import mss
 import numpy as np
 from PIL import Image
 
 from openrecall.config import screenshots_path, args
-from openrecall.database import insert_entry
+from openrecall.database import insert_entries, insert_entry
 from openrecall.nlp import get_embedding
 from openrecall.ocr import extract_text_from_image
 from openrecall.utils import (
@@ -16,6 +17,14 @@ from openrecall.utils import (
     is_user_active,
 )
 
+# Captured entries are buffered and written in one transaction once either
+# limit is reached, instead of committing every screenshot individually.
+FLUSH_INTERVAL_SECONDS: float = 10.0
+FLUSH_MAX_ENTRIES: int = 10
+# Entries that failed to store are retried on the next flush; beyond this many
+# the oldest are dropped so a database outage can't grow the buffer unbounded.
+FLUSH_MAX_PENDING: int = 1000
+
 
 def mean_structured_similarity_index(
     img1: np.ndarray, img2: np.ndarray, L: int = 255
@@ -104,65 +113,112 @@ def take_screenshots() -> List[np.ndarray]:
     return screenshots
 
 
-def record_screenshots_thread() -> None:
+def flush_pending_entries(
+    pending_entries: List[Tuple[str, int, np.ndarray, str, str, str]]
+) -> List[Tuple[str, int, np.ndarray, str, str, str]]:
+    """Writes buffered entries to the database in one batch.
+
+    Args:
+        pending_entries: The buffered (text, timestamp, embedding, app, title,
+            filename) tuples.
+
+    Returns:
+        The entries still pending: empty on success, otherwise the entries that
+        could not be stored, capped at FLUSH_MAX_PENDING, for the next flush.
+    """
+    if not pending_entries:
+        return pending_entries
+    if insert_entries(pending_entries) > 0:
+        return []
+    # Retry row by row so one entry the database refuses doesn't hold back the rest
+    failed = [entry for entry in pending_entries if insert_entry(*entry) is None]
+    if not failed:
+        return []
+    print(f"Failed to store {len(failed)} buffered entries; will retry.")
+    if len(failed) > FLUSH_MAX_PENDING:
+        print(f"Dropping {len(failed) - FLUSH_MAX_PENDING} oldest buffered entries.")
+        failed = failed[-FLUSH_MAX_PENDING:]
+    return failed
+
+
+def record_screenshots_thread(stop_event: Optional[threading.Event] = None) -> None:
     """
     Continuously records screenshots, processes them, and stores relevant data.
 
     Checks for user activity and image similarity before processing and saving
     screenshots, associated OCR text, embeddings, and active application info.
-    Runs in an infinite loop, intended to be executed in a separate thread.
+    Entries are buffered and written in batches (see FLUSH_INTERVAL_SECONDS and
+    FLUSH_MAX_ENTRIES). Runs until `stop_event` is set, intended to be executed
+    in a separate thread; buffered entries are flushed before it returns.
+
+    Args:
+        stop_event: Set to stop recording. Runs indefinitely if None.
     """
+    if stop_event is None:
+        stop_event = threading.Event()
+
     # TODO: Move this environment variable setting to the application's entry point.
     # HACK: Prevents a warning/error from the huggingface/tokenizers library
     # when used in environments where multiprocessing fork safety is a concern.
     os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
     last_screenshots: List[np.ndarray] = take_screenshots()
-
-    while True:
-        if not is_user_active():
-            time.sleep(3)  # Wait longer if user is inactive
-            continue
-
-        current_screenshots: List[np.ndarray] = take_screenshots()
-
-        # Ensure we have a last_screenshot for each current_screenshot
-        # This handles cases where monitor setup might change (though unlikely mid-run)
-        if len(last_screenshots) != len(current_screenshots):
-             # If monitor count changes, reset last_screenshots and continue
-             last_screenshots = current_screenshots
-             time.sleep(3)
-             continue
-
-
-        timestamp = int(time.time()) # Use same timestamp for all monitors in this batch
-        for i, current_screenshot in enumerate(current_screenshots):
-            last_screenshot = last_screenshots[i]
-
-            if not is_similar(current_screenshot, last_screenshot):
-                last_screenshots[i] = current_screenshot  # Update the last screenshot for this monitor
-                image = Image.fromarray(current_screenshot)
+    pending_entries: List[Tuple[str, int, np.ndarray, str, str, str]] = []
+    last_flush: float = time.monotonic()
+
+    try:
+        while not stop_event.is_set():
+            if pending_entries and (
+                len(pending_entries) >= FLUSH_MAX_ENTRIES
+                or time.monotonic() - last_flush >= FLUSH_INTERVAL_SECONDS
+            ):
+                pending_entries = flush_pending_entries(pending_entries)
+                last_flush = time.monotonic()
+
+            if not is_user_active():
+                stop_event.wait(3)  # Wait longer if user is inactive
+                continue
+
+            current_screenshots: List[np.ndarray] = take_screenshots()
+
+            # Ensure we have a last_screenshot for each current_screenshot
+            # This handles cases where monitor setup might change (though unlikely mid-run)
+            if len(last_screenshots) != len(current_screenshots):
+                 # If monitor count changes, reset last_screenshots and continue
+                 last_screenshots = current_screenshots
+                 stop_event.wait(3)
+                 continue
+
+
+            timestamp = int(time.time()) # Use same timestamp for all monitors in this batch
+            for i, current_screenshot in enumerate(current_screenshots):
+                last_screenshot = last_screenshots[i]
+
+                if not is_similar(current_screenshot, last_screenshot):
+                    last_screenshots[i] = current_screenshot  # Update the last screenshot for this monitor
+                    image = Image.fromarray(current_screenshot)
                 
-                filename = f"{timestamp}_{i}.webp" # Add monitor index to filename for uniqueness
-                filepath = os.path.join(screenshots_path, filename)
-                image.save(
-                    filepath,
-                    format="webp",
-                    lossless=True,
-                )
-                text: str = extract_text_from_image(current_screenshot)
-                # Only proceed if OCR actually extracts text
-                if text.strip():
-                    embedding: np.ndarray = get_embedding(text)
-                    active_app_name: str = get_active_app_name() or "Unknown App"
-                    active_window_title: str = get_active_window_title() or "Unknown Title"
-                    insert_entry(
-                        text, timestamp, embedding, active_app_name, active_window_title, filename # Pass filename
+                    filename = f"{timestamp}_{i}.webp" # Add monitor index to filename for uniqueness
+                    filepath = os.path.join(screenshots_path, filename)
+                    image.save(
+                        filepath,
+                        format="webp",
+                        lossless=True,
                     )
-
-        time.sleep(3) # Wait before taking the next screenshot
-
-    return screenshots
+                    text: str = extract_text_from_image(current_screenshot)
+                    # Only proceed if OCR actually extracts text
+                    if text.strip():
+                        embedding: np.ndarray = get_embedding(text)
+                        active_app_name: str = get_active_app_name() or "Unknown App"
+                        active_window_title: str = get_active_window_title() or "Unknown Title"
+                        pending_entries.append(
+                            (text, timestamp, embedding, active_app_name, active_window_title, filename)
+                        )
+
+            stop_event.wait(3) # Wait before taking the next screenshot
+    finally:
+        # Don't lose entries whose screenshots are already saved to disk
+        flush_pending_entries(pending_entries)
 
 
 
@@ -1,3 +1,5 @@
+import gc
+import threading
 import unittest
 import sqlite3
 import os
@@ -20,8 +22,15 @@ with patch('openrecall.config.db_path', mock_db_path):
     from openrecall.database import (
         create_db,
         insert_entry,
+        insert_entries,
+        bulk_ingest,
         get_all_entries,
+        get_entries,
+        iter_entries,
         get_timestamps,
+        fetch_state,
+        get_embeddings_matrix,
+        close_connections,
         Entry,
     )
     # Also patch db_path within the database module itself if it was imported directly there
@@ -48,6 +57,7 @@ class TestDatabase(unittest.TestCase):
                 cls.conn.close()
         except Exception:
             pass # Ignore errors during cleanup
+        close_connections()
         os.remove(cls.db_path)
         # Clean up sys.path modification
         sys.path.pop(0)
@@ -75,11 +85,227 @@ class TestDatabase(unittest.TestCase):
         self.assertIsNotNone(result)
         self.assertEqual(result[0], 'entries')
 
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='embeddings'")
+        self.assertIsNotNone(cursor.fetchone())
+
         # Check if index exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_timestamp'")
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_ts_desc'")
         result = cursor.fetchone()
         self.assertIsNotNone(result)
-        self.assertEqual(result[0], 'idx_timestamp')
+        self.assertEqual(result[0], 'idx_ts_desc')
+
+        # The legacy ascending index is replaced
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_timestamp'")
+        self.assertIsNone(cursor.fetchone())
+
+    def test_timestamps_query_uses_index(self):
+        """Test that the timestamp query scans idx_ts_desc without sorting."""
+        cursor = self.conn.cursor()
+        cursor.execute("EXPLAIN QUERY PLAN SELECT timestamp FROM entries ORDER BY timestamp DESC")
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("COVERING INDEX idx_ts_desc", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_entries_id_is_not_autoincrement(self):
+        """Test that inserts don't maintain an AUTOINCREMENT sequence."""
+        insert_entry("Text", int(time.time()), np.ones(3, dtype=np.float32), "App", "Title")
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE name='sqlite_sequence'")
+        self.assertIsNone(cursor.fetchone())
+
+    def test_create_db_enables_wal(self):
+        """Test that create_db switches the database to WAL journaling."""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA journal_mode")
+        self.assertEqual(cursor.fetchone()[0], 'wal')
+
+    def test_create_db_sets_user_version(self):
+        """Test that create_db records the schema version."""
+        cursor = self.conn.cursor()
+        cursor.execute("PRAGMA user_version")
+        self.assertEqual(cursor.fetchone()[0], openrecall.database._SCHEMA_VERSION)
+
+    def test_create_db_migrates_legacy_schema(self):
+        """Test migrating a legacy database with UNIQUE timestamps and no filename."""
+        legacy_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        legacy_file.close()
+        legacy_conn = sqlite3.connect(legacy_file.name)
+        legacy_conn.execute(
+            """CREATE TABLE entries (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   app TEXT,
+                   title TEXT,
+                   text TEXT,
+                   timestamp INTEGER UNIQUE,
+                   embedding BLOB
+               )"""
+        )
+        embedding = np.array([0.1, 0.2], dtype=np.float32)
+        legacy_conn.execute(
+            "INSERT INTO entries (app, title, text, timestamp, embedding) VALUES (?, ?, ?, ?, ?)",
+            ("App", "Title", "Legacy", 100, embedding.tobytes()),
+        )
+        legacy_conn.commit()
+        legacy_conn.close()
+
+        close_connections()
+        try:
+            with patch.object(openrecall.database, "db_path", legacy_file.name):
+                create_db()
+                entries = get_all_entries()
+                # Duplicate timestamps are allowed after migration
+                self.assertIsNotNone(insert_entry("New", 100, embedding, "App", "Title"))
+                close_connections()
+        finally:
+            os.remove(legacy_file.name)
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].text, "Legacy")
+        self.assertIsNone(entries[0].filename)
+        np.testing.assert_array_almost_equal(entries[0].embedding, embedding, decimal=2)
+
+    def test_create_db_drops_autoincrement(self):
+        """Test migrating a version 4 database whose id is AUTOINCREMENT."""
+        v4_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        v4_file.close()
+        v4_conn = sqlite3.connect(v4_file.name)
+        v4_conn.execute(
+            """CREATE TABLE entries (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   app TEXT,
+                   title TEXT,
+                   text TEXT,
+                   timestamp INTEGER,
+                   filename TEXT
+               )"""
+        )
+        v4_conn.execute("CREATE TABLE embeddings (id INTEGER PRIMARY KEY, embedding BLOB)")
+        v4_conn.execute(
+            "INSERT INTO entries (app, title, text, timestamp, filename) VALUES ('A', 'T', 'Old', 100, NULL)"
+        )
+        v4_conn.execute(
+            "INSERT INTO embeddings (id, embedding) VALUES (1, ?)",
+            (np.array([0.5, 0.25], dtype=np.float32).tobytes(),),
+        )
+        v4_conn.execute("PRAGMA user_version = 4")
+        v4_conn.commit()
+        v4_conn.close()
+
+        close_connections()
+        try:
+            with patch.object(openrecall.database, "db_path", v4_file.name):
+                create_db()
+                entries = get_all_entries()
+                close_connections()
+            check_conn = sqlite3.connect(v4_file.name)
+            sequence_rows = check_conn.execute("SELECT name FROM sqlite_sequence").fetchall()
+            check_conn.close()
+        finally:
+            os.remove(v4_file.name)
+
+        self.assertEqual(sequence_rows, [])
+        self.assertEqual([(entry.id, entry.text) for entry in entries], [(1, "Old")])
+
+    def test_has_unique_timestamp(self):
+        """Test detecting a UNIQUE timestamp however it was declared."""
+        memory_conn = sqlite3.connect(":memory:")
+        cursor = memory_conn.cursor()
+        cursor.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, timestamp INTEGER, UNIQUE (timestamp))")
+        self.assertTrue(openrecall.database._has_unique_timestamp(cursor))
+
+        cursor.execute("DROP TABLE entries")
+        cursor.execute("CREATE TABLE entries (id INTEGER PRIMARY KEY, timestamp INTEGER, text TEXT, UNIQUE (timestamp, text))")
+        cursor.execute("CREATE INDEX idx_ts ON entries (timestamp)")
+        self.assertFalse(openrecall.database._has_unique_timestamp(cursor))
+        memory_conn.close()
+
+    def test_create_db_moves_embeddings_out_of_entries(self):
+        """Test migrating a version 2 database that stores embeddings in entries."""
+        v2_file = tempfile.NamedTemporaryFile(suffix=".db", delete=False)
+        v2_file.close()
+        v2_conn = sqlite3.connect(v2_file.name)
+        v2_conn.execute(
+            """CREATE TABLE entries (
+                   id INTEGER PRIMARY KEY AUTOINCREMENT,
+                   app TEXT,
+                   title TEXT,
+                   text TEXT,
+                   timestamp INTEGER,
+                   embedding BLOB,
+                   filename TEXT
+               )"""
+        )
+        v2_conn.execute("CREATE INDEX idx_ts_desc ON entries (timestamp DESC)")
+        embedding = np.array([0.5, 0.25], dtype=np.float32)
+        v2_conn.execute(
+            "INSERT INTO entries (app, title, text, timestamp, embedding, filename) VALUES (?, ?, ?, ?, ?, ?)",
+            ("App", "Title", "Old", 100, embedding.tobytes(), "100_0.webp"),
+        )
+        v2_conn.execute("PRAGMA user_version = 2")
+        v2_conn.commit()
+        v2_conn.close()
+
+        close_connections()
+        try:
+            with patch.object(openrecall.database, "db_path", v2_file.name), patch.object(
+                openrecall.database,
+                "_rebuild_entries_table",
+                wraps=openrecall.database._rebuild_entries_table,
+            ) as mock_rebuild:
+                create_db()
+                entries = get_all_entries()
+                close_connections()
+            check_conn = sqlite3.connect(v2_file.name)
+            columns = [row[1] for row in check_conn.execute("PRAGMA table_info(entries)")]
+            indexes = [row[1] for row in check_conn.execute("PRAGMA index_list(entries)")]
+            check_conn.close()
+        finally:
+            os.remove(v2_file.name)
+
+        # Rebuilt once for v3, which also drops AUTOINCREMENT for v5
+        self.assertEqual(mock_rebuild.call_count, 1)
+        self.assertNotIn("embedding", columns)
+        self.assertEqual(entries[0].id, 1)
+        self.assertIn("idx_ts_desc", indexes)
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].filename, "100_0.webp")
+        np.testing.assert_array_almost_equal(entries[0].embedding, embedding, decimal=2)
+
+    def test_deleting_entry_deletes_embedding(self):
+        """Test that removing an entry also removes its embedding."""
+        inserted_id = insert_entry("Text", int(time.time()), np.ones(3, dtype=np.float32), "App", "Title")
+        self.conn.execute("DELETE FROM entries WHERE id = ?", (inserted_id,))
+        self.conn.commit()
+        cursor = self.conn.execute("SELECT COUNT(*) FROM embeddings")
+        self.assertEqual(cursor.fetchone()[0], 0)
+
+    def test_read_connection_is_reused(self):
+        """Test that reads reuse the thread's connection until it is closed."""
+        conn = openrecall.database._get_read_conn()
+        self.assertIs(openrecall.database._get_read_conn(), conn)
+
+        close_connections()
+        new_conn = openrecall.database._get_read_conn()
+        self.assertIsNot(new_conn, conn)
+        self.assertEqual(get_timestamps(), [])
+
+    def test_read_connections_closed_when_threads_exit(self):
+        """Test that short-lived threads don't leave read connections behind."""
+        holders_before = len(openrecall.database._read_holders)
+        threads = [threading.Thread(target=get_timestamps) for _ in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        gc.collect()
+        self.assertLessEqual(len(openrecall.database._read_holders), holders_before)
+
+    def test_read_connection_is_autocommit(self):
+        """Test that reads leave no transaction open on the read connection."""
+        conn = openrecall.database._get_read_conn()
+        self.assertIsNone(conn.isolation_level)
+        get_all_entries()
+        get_timestamps()
+        self.assertFalse(conn.in_transaction)
 
     def test_02_insert_entry(self):
         """Test inserting a single entry."""
@@ -95,13 +321,81 @@ class TestDatabase(unittest.TestCase):
         cursor.execute("SELECT * FROM entries WHERE id = ?", (inserted_id,))
         result = cursor.fetchone()
         self.assertIsNotNone(result)
-        # (id, app, title, text, timestamp, embedding_blob)
+        # (id, app, title, text, timestamp, filename)
         self.assertEqual(result[1], "TestApp")
         self.assertEqual(result[2], "TestTitle")
         self.assertEqual(result[3], "Test text")
         self.assertEqual(result[4], ts)
-        retrieved_embedding = np.frombuffer(result[5], dtype=np.float32)
-        np.testing.assert_array_almost_equal(retrieved_embedding, embedding)
+
+        # The embedding is stored in its own table under the same id
+        cursor.execute("SELECT embedding FROM embeddings WHERE id = ?", (inserted_id,))
+        retrieved_embedding = openrecall.database._decode_embeddings(cursor.fetchone()[0], 1)[0]
+        np.testing.assert_array_almost_equal(retrieved_embedding, embedding, decimal=2)
+
+    def test_insert_entry_non_contiguous_embedding(self):
+        """Test that strided and float64 embeddings are stored correctly."""
+        ts = int(time.time())
+        embedding = (np.arange(6, dtype=np.float64) / 10)[::2]
+        self.assertFalse(embedding.flags["C_CONTIGUOUS"])
+        inserted_id = insert_entry("Strided", ts, embedding, "App", "Title")
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT embedding FROM embeddings WHERE id = ?", (inserted_id,))
+        stored = openrecall.database._decode_embeddings(cursor.fetchone()[0], 1)[0]
+        np.testing.assert_array_almost_equal(stored, [0.0, 0.2, 0.4], decimal=2)
+
+    def test_embeddings_are_quantized(self):
+        """Test that embeddings are stored as int8 values plus a float32 scale."""
+        ts = int(time.time())
+        embedding = np.linspace(-1, 1, 384, dtype=np.float32)
+        inserted_id = insert_entry("Quantized", ts, embedding, "App", "Title")
+        zero_id = insert_entry("Zero", ts, np.zeros(384, dtype=np.float32), "App", "Title")
+
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT embedding FROM embeddings WHERE id = ?", (inserted_id,))
+        blob = cursor.fetchone()[0]
+        self.assertEqual(len(blob), 384 + 4)
+
+        decoded = openrecall.database._decode_embeddings(blob, 1)[0]
+        self.assertLessEqual(np.abs(decoded - embedding).max(), 1 / 254 + 1e-6)
+        cosine = decoded @ embedding / (np.linalg.norm(decoded) * np.linalg.norm(embedding))
+        self.assertGreater(cosine, 0.9999)
+
+        cursor.execute("SELECT embedding FROM embeddings WHERE id = ?", (zero_id,))
+        zero = openrecall.database._decode_embeddings(cursor.fetchone()[0], 1)[0]
+        np.testing.assert_array_equal(zero, np.zeros(384, dtype=np.float32))
+
+    def test_insert_zeroes_non_finite_embeddings(self):
+        """Test that NaN/inf components are stored as zero without failing the batch."""
+        ts = int(time.time())
+        good = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        self.assertIsNotNone(
+            insert_entry("NaN", ts, np.array([0.1, np.nan, 0.3], dtype=np.float32), "App", "Title")
+        )
+        self.assertEqual(
+            insert_entries(
+                [
+                    ("Good", ts, good, "App", "Title", None),
+                    ("Inf", ts, np.array([np.inf, 0.5, -np.inf]), "App", "Title", None),
+                ]
+            ),
+            2,
+        )
+
+        stored = {entry.text: entry.embedding for entry in get_all_entries()}
+        np.testing.assert_array_almost_equal(stored["NaN"], [0.1, 0.0, 0.3], decimal=2)
+        np.testing.assert_array_almost_equal(stored["Good"], good, decimal=2)
+        np.testing.assert_array_almost_equal(stored["Inf"], [0.0, 0.5, 0.0], decimal=2)
+
+    def test_embedding_adapter_is_scoped(self):
+        """Test that only wrapped embeddings are quantized when bound by sqlite3."""
+        array = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        stored = self.conn.execute("SELECT ?", (array,)).fetchone()[0]
+        self.assertEqual(stored, array.tobytes())
+
+        wrapped = openrecall.database._Embedding(array)
+        stored = self.conn.execute("SELECT ?", (wrapped,)).fetchone()[0]
+        self.assertEqual(stored, openrecall.database._quantize_embedding(array))
 
     def test_insert_duplicate_timestamp(self):
         """Test inserting an entry with a duplicate timestamp (should be allowed now)."""
@@ -127,6 +421,84 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(rows[0][0], "First text")
         self.assertEqual(rows[1][0], "Second text")
 
+    def test_insert_entries_batch(self):
+        """Test inserting several entries in one transaction."""
+        ts = int(time.time())
+        batch = [
+            ("Text 1", ts, np.array([0.1, 0.2], dtype=np.float32), "App1", "Title1", "a.webp"),
+            ("Text 2", ts + 1, np.array([0.3, 0.4], dtype=np.float64), "App2", "Title2", "b.webp"),
+        ]
+        self.assertEqual(insert_entries(batch), 2)
+
+        entries = get_all_entries()
+        self.assertEqual([entry.text for entry in entries], ["Text 2", "Text 1"])
+        self.assertEqual(entries[0].filename, "b.webp")
+        self.assertEqual(entries[0].embedding.dtype, np.float32)
+        np.testing.assert_array_almost_equal(entries[0].embedding, [0.3, 0.4], decimal=2)
+
+    def test_insert_entries_rolls_back_failed_batch(self):
+        """Test that a failing batch leaves no rows and the writer usable."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        batch = [
+            ("Good", ts, emb, "App", "Title", None),
+            ("Bad", ts + 1, emb, "App", {"not": "bindable"}, None),
+        ]
+        self.assertEqual(insert_entries(batch), 0)
+        self.assertEqual(get_timestamps(), [])
+
+        self.assertIsNotNone(insert_entry("After", ts, emb, "App", "Title"))
+        self.assertEqual(get_timestamps(), [ts])
+
+    def test_failed_commit_rolls_back(self):
+        """Test that a COMMIT failure doesn't leave the writer inside a transaction."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        # A deferred foreign key violation is only reported at COMMIT
+        self.conn.execute(
+            "CREATE TABLE commit_guard (ref INTEGER REFERENCES entries(id) DEFERRABLE INITIALLY DEFERRED)"
+        )
+        self.conn.commit()
+        try:
+            writer = openrecall.database._get_write_conn()
+            writer.execute("PRAGMA foreign_keys = ON")
+            with self.assertRaises(sqlite3.IntegrityError):
+                with openrecall.database._write_transaction() as cursor:
+                    cursor.execute("INSERT INTO commit_guard (ref) VALUES (-1)")
+            self.assertFalse(writer.in_transaction)
+            self.assertIsNotNone(insert_entry("After", ts, emb, "App", "Title"))
+        finally:
+            writer.execute("PRAGMA foreign_keys = OFF")
+            self.conn.execute("DROP TABLE commit_guard")
+            self.conn.commit()
+
+    def test_insert_entries_empty(self):
+        """Test that an empty batch is a no-op."""
+        self.assertEqual(insert_entries([]), 0)
+        self.assertEqual(get_timestamps(), [])
+
+    def test_bulk_ingest_rebuilds_index(self):
+        """Test that bulk_ingest drops idx_ts_desc while inserting and restores it."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        index_sql = "SELECT name FROM sqlite_master WHERE type='index' AND name='idx_ts_desc'"
+
+        with bulk_ingest():
+            self.assertIsNone(self.conn.execute(index_sql).fetchone())
+            insert_entries([(f"Text {i}", ts + i, emb, "App", "Title", None) for i in range(3)])
+
+        self.assertIsNotNone(self.conn.execute(index_sql).fetchone())
+        self.assertEqual(get_timestamps(), [ts + 2, ts + 1, ts])
+
+    def test_create_db_restores_index_after_interrupted_bulk_ingest(self):
+        """Test that startup rebuilds idx_ts_desc if a bulk import died midway."""
+        self.conn.execute("DROP INDEX idx_ts_desc")
+        self.conn.commit()
+
+        create_db()
+        cursor = self.conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND name='idx_ts_desc'")
+        self.assertIsNotNone(cursor.fetchone())
+
     def test_get_all_entries_empty(self):
         """Test getting entries from an empty database."""
         entries = get_all_entries()
@@ -153,16 +525,137 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(entries[0].text, "Text 2")
         self.assertEqual(entries[0].app, "App2")
         self.assertEqual(entries[0].title, "Title2")
-        np.testing.assert_array_almost_equal(entries[0].embedding, emb2)
+        np.testing.assert_array_almost_equal(entries[0].embedding, emb2, decimal=2)
         self.assertIsInstance(entries[0].id, int)
 
         self.assertEqual(entries[1].timestamp, ts1)
         self.assertEqual(entries[1].text, "Text 1")
-        np.testing.assert_array_almost_equal(entries[1].embedding, emb1)
+        np.testing.assert_array_almost_equal(entries[1].embedding, emb1, decimal=2)
 
         self.assertEqual(entries[2].timestamp, ts3)
         self.assertEqual(entries[2].text, "Text 3")
-        np.testing.assert_array_almost_equal(entries[2].embedding, emb3)
+        np.testing.assert_array_almost_equal(entries[2].embedding, emb3, decimal=2)
+
+    def test_get_embeddings_matrix(self):
+        """Test loading all embeddings as one matrix ordered by id."""
+        ts = int(time.time())
+        emb1 = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        emb2 = np.array([0.4, 0.5, 0.6], dtype=np.float32)
+        id1 = insert_entry("T1", ts + 10, emb1, "A1", "T1")
+        id2 = insert_entry("T2", ts, emb2, "A2", "T2")
+
+        ids, matrix = get_embeddings_matrix()
+        self.assertEqual(ids.tolist(), [id1, id2])
+        self.assertEqual(matrix.shape, (2, 3))
+        self.assertEqual(matrix.dtype, np.float32)
+        np.testing.assert_array_almost_equal(matrix, np.stack([emb1, emb2]), decimal=2)
+
+    def test_get_embeddings_matrix_mixed_sizes(self):
+        """Test that the newest embedding's size wins and others are reported."""
+        ts = int(time.time())
+        insert_entry("Old model", ts, np.ones(2, dtype=np.float32), "A", "T")
+        new_id = insert_entry("New model", ts + 1, np.ones(3, dtype=np.float32), "A", "T")
+
+        with patch("builtins.print") as mock_print:
+            ids, matrix = get_embeddings_matrix()
+        self.assertEqual(ids.tolist(), [new_id])
+        self.assertEqual(matrix.shape, (1, 3))
+        mock_print.assert_called_once()
+
+    def test_get_embeddings_matrix_empty(self):
+        """Test loading embeddings from an empty database."""
+        ids, matrix = get_embeddings_matrix()
+        self.assertEqual(ids.shape, (0,))
+        self.assertEqual(matrix.shape, (0, 0))
+
+    def test_iter_entries_chunked(self):
+        """Test that iter_entries yields every row across fetch chunks."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        insert_entries([(f"Text {i}", ts + i, emb, "App", "Title", f"{i}.webp") for i in range(5)])
+
+        with patch.object(openrecall.database, "_FETCH_CHUNK_SIZE", 2):
+            entries = list(iter_entries())
+        self.assertEqual([entry.timestamp for entry in entries], [ts + i for i in reversed(range(5))])
+        self.assertEqual(entries[0].filename, "4.webp")
+        np.testing.assert_array_almost_equal(entries[-1].embedding, emb, decimal=2)
+
+    def test_get_entries_pages(self):
+        """Test keyset pagination, including entries that share a timestamp."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        insert_entries([
+            ("Old", ts, emb, "App", "Title", "old.webp"),
+            ("Monitor 0", ts + 10, emb, "App", "Title", "m0.webp"),
+            ("Monitor 1", ts + 10, emb, "App", "Title", "m1.webp"),
+        ])
+
+        first_page = get_entries(2)
+        self.assertEqual([entry.text for entry in first_page], ["Monitor 1", "Monitor 0"])
+        last = first_page[-1]
+        second_page = get_entries(2, last.timestamp, last.id)
+        self.assertEqual([entry.text for entry in second_page], ["Old"])
+        np.testing.assert_array_almost_equal(second_page[0].embedding, emb, decimal=2)
+
+        self.assertEqual([entry.text for entry in get_entries(5, ts + 10)], ["Old"])
+        self.assertEqual(get_entries(2, ts), [])
+
+    def test_get_entries_query_uses_index(self):
+        """Test that paging searches idx_ts_desc without a sort step."""
+        sql = (
+            openrecall.database._SELECT_ENTRIES_SQL
+            + " WHERE (e.timestamp, e.id) < (?, ?)"
+            + openrecall.database._ORDER_ENTRIES_SQL
+            + " LIMIT ?"
+        )
+        cursor = self.conn.execute("EXPLAIN QUERY PLAN " + sql, (0, 0, 10))
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("SEARCH e USING INDEX idx_ts_desc", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_get_all_entries_share_embedding_matrix(self):
+        """Test that entry embeddings are views into one contiguous matrix."""
+        ts = int(time.time())
+        insert_entry("T1", ts, np.array([0.1, 0.2], dtype=np.float32), "A1", "T1")
+        insert_entry("T2", ts + 1, np.array([0.3, 0.4], dtype=np.float32), "A2", "T2")
+
+        entries = get_all_entries()
+        self.assertIsNotNone(entries[0].embedding.base)
+        self.assertIs(entries[0].embedding.base, entries[1].embedding.base)
+        np.testing.assert_array_almost_equal(entries[0].embedding, [0.3, 0.4], decimal=2)
+        np.testing.assert_array_almost_equal(entries[1].embedding, [0.1, 0.2], decimal=2)
+
+    def test_get_all_entries_mixed_embedding_sizes(self):
+        """Test that embeddings of different sizes are still decoded."""
+        ts = int(time.time())
+        insert_entry("Short", ts, np.array([0.1, 0.2], dtype=np.float32), "A", "T")
+        insert_entry("Long", ts + 1, np.array([0.3, 0.4, 0.5], dtype=np.float32), "A", "T")
+
+        entries = get_all_entries()
+        self.assertEqual([entry.embedding.shape for entry in entries], [(3,), (2,)])
+
+    def test_fetch_state(self):
+        """Test fetching entries and timestamps together."""
+        ts = int(time.time())
+        emb = np.array([0.1, 0.2], dtype=np.float32)
+        insert_entries([(f"Text {i}", ts + i, emb, "App", "Title", None) for i in range(3)])
+
+        entries, timestamps = fetch_state()
+        self.assertEqual(timestamps, [ts + 2, ts + 1, ts])
+        self.assertEqual(timestamps, get_timestamps())
+        self.assertEqual([entry.timestamp for entry in entries], timestamps)
+
+        entries, timestamps = fetch_state(limit=2)
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(timestamps, [ts + 2, ts + 1])
+
+    def test_entries_query_uses_index(self):
+        """Test that listing entries scans idx_ts_desc without a sort step."""
+        sql = openrecall.database._SELECT_ENTRIES_SQL + openrecall.database._ORDER_ENTRIES_SQL
+        cursor = self.conn.execute("EXPLAIN QUERY PLAN " + sql)
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+        self.assertIn("SCAN e USING INDEX idx_ts_desc", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
 
     def test_get_timestamps_empty(self):
         """Test getting timestamps from an empty database."""